@@ -1,13 +1,91 @@
+import os
+from itertools import count
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
 from sqlmodel import SQLModel, Session, create_engine
 
 DATABASE_URL = "sqlite:///./ekonum.db"
-engine = create_engine(DATABASE_URL, echo=False)
+engine = create_engine(
+    DATABASE_URL,
+    echo=False,
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=5,
+    max_overflow=10,
+    pool_recycle=3600,
+)
+
+# Readers get their own pool so GET handlers never queue behind writers.
+READONLY_DATABASE_URL = "sqlite:///file:./ekonum.db?mode=ro&uri=true"
+ro_engine = create_engine(
+    READONLY_DATABASE_URL,
+    echo=False,
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=os.cpu_count() or 1,
+    max_overflow=10,
+    pool_recycle=3600,
+)
+
+
+@event.listens_for(engine, "connect")
+def _pragmas(dbapi_conn, _):
+    # WAL + NORMAL sync lets readers run alongside the writer and batches fsyncs.
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=memory")
+    cur.execute("PRAGMA cache_size=-20000")
+    cur.execute("PRAGMA busy_timeout=5000")
+    cur.execute("PRAGMA mmap_size=30000000000")
+    cur.execute("PRAGMA foreign_keys=ON")
+    cur.close()
+
+
+@event.listens_for(ro_engine, "connect")
+def _ro_pragmas(dbapi_conn, _):
+    # Journal and sync settings belong to the writer; readers only tune caching.
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA temp_store=memory")
+    cur.execute("PRAGMA cache_size=-20000")
+    cur.execute("PRAGMA busy_timeout=5000")
+    cur.execute("PRAGMA mmap_size=30000000000")
+    cur.close()
+    # pysqlite only sends BEGIN before DML; take over so SELECTs get one too.
+    dbapi_conn.isolation_level = None
+
+
+@event.listens_for(ro_engine, "begin")
+def _ro_begin(conn):
+    # Pin a single WAL snapshot for the whole session, even if a writer commits meanwhile.
+    conn.exec_driver_sql("BEGIN")
+
+
+# Bumped after every write so cached projections know when their inputs changed.
+_versions = count(1)
+DATA_VERSION = 0
+
+
+def bump_version() -> int:
+    global DATA_VERSION
+    DATA_VERSION = next(_versions)
+    return DATA_VERSION
 
 
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
+    # create_all skips tables that already exist; add indexes declared since.
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+def get_ro_session():
+    with Session(ro_engine) as session:
+        yield session
@@ -1,10 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from backend.db import init_db
 from backend.routers import entities, projections
 
-app = FastAPI(title="Ekonum Financial Planner")
+app = FastAPI(title="Ekonum Financial Planner", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
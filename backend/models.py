@@ -1,8 +1,8 @@
 from datetime import date
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
-from sqlmodel import Column, Date, Enum as SqlEnum, Field, SQLModel
+from sqlmodel import Column, Date, Enum as SqlEnum, Field, Relationship, SQLModel
 
 
 class OfferType(str, Enum):
@@ -31,7 +31,7 @@ class Offer(SQLModel, table=True):
 class Contract(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     client_name: str
-    offer_id: int = Field(foreign_key="offer.id")
+    offer_id: int = Field(foreign_key="offer.id", index=True)
     start_date: date
     end_date: Optional[date] = None
     recurrence: Recurrence = Field(default=Recurrence.ONE_TIME, sa_column=Column(SqlEnum(Recurrence)))
@@ -39,20 +39,24 @@ class Contract(SQLModel, table=True):
     quantity: int = Field(default=1)
     tax_rate: float = Field(default=0.2, description="VAT rate applied to payments")
 
+    payment_events: List["PaymentEvent"] = Relationship(back_populates="contract")
+
 
 class PaymentEvent(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    contract_id: int = Field(foreign_key="contract.id")
+    contract_id: int = Field(foreign_key="contract.id", index=True)
     label: str
     due_date: date
     amount: float
 
+    contract: Optional[Contract] = Relationship(back_populates="payment_events")
+
 
 class FixedCost(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     monthly_amount: float
-    start_date: date
+    start_date: date = Field(index=True)
     end_date: Optional[date] = None
 
 
@@ -75,6 +79,6 @@ class Loan(SQLModel, table=True):
 
 class ActualEntry(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    entry_date: date = Field(sa_column=Column(Date))
+    entry_date: date = Field(sa_column=Column(Date, index=True))
     category: str
     amount: float
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlmodel import Session
 
-from backend.db import get_session
+from backend.db import bump_version, get_ro_session, get_session
 from backend.models import Asset, Contract, FixedCost, Loan, Offer, PaymentEvent
 
 router = APIRouter(prefix="/api", tags=["entities"])
@@ -11,26 +11,28 @@ router = APIRouter(prefix="/api", tags=["entities"])
 def create_offer(offer: Offer, session: Session = Depends(get_session)):
     session.add(offer)
     session.commit()
+    bump_version()
     session.refresh(offer)
     return offer
 
 
 @router.get("/offers", response_model=list[Offer])
-def list_offers(session: Session = Depends(get_session)):
-    return session.exec(select(Offer)).all()
+def list_offers(session: Session = Depends(get_ro_session)):
+    return session.exec(Offer.__table__.select()).mappings().all()
 
 
 @router.post("/contracts", response_model=Contract)
 def create_contract(contract: Contract, session: Session = Depends(get_session)):
     session.add(contract)
     session.commit()
+    bump_version()
     session.refresh(contract)
     return contract
 
 
 @router.get("/contracts", response_model=list[Contract])
-def list_contracts(session: Session = Depends(get_session)):
-    return session.exec(select(Contract)).all()
+def list_contracts(session: Session = Depends(get_ro_session)):
+    return session.exec(Contract.__table__.select()).mappings().all()
 
 
 @router.post("/payments", response_model=PaymentEvent)
@@ -40,49 +42,53 @@ def create_payment(event: PaymentEvent, session: Session = Depends(get_session))
         raise HTTPException(status_code=404, detail="Contract not found")
     session.add(event)
     session.commit()
+    bump_version()
     session.refresh(event)
     return event
 
 
 @router.get("/payments", response_model=list[PaymentEvent])
-def list_payments(session: Session = Depends(get_session)):
-    return session.exec(select(PaymentEvent)).all()
+def list_payments(session: Session = Depends(get_ro_session)):
+    return session.exec(PaymentEvent.__table__.select()).mappings().all()
 
 
 @router.post("/fixed-costs", response_model=FixedCost)
 def create_fixed_cost(cost: FixedCost, session: Session = Depends(get_session)):
     session.add(cost)
     session.commit()
+    bump_version()
     session.refresh(cost)
     return cost
 
 
 @router.get("/fixed-costs", response_model=list[FixedCost])
-def list_fixed_costs(session: Session = Depends(get_session)):
-    return session.exec(select(FixedCost)).all()
+def list_fixed_costs(session: Session = Depends(get_ro_session)):
+    return session.exec(FixedCost.__table__.select()).mappings().all()
 
 
 @router.post("/assets", response_model=Asset)
 def create_asset(asset: Asset, session: Session = Depends(get_session)):
     session.add(asset)
     session.commit()
+    bump_version()
     session.refresh(asset)
     return asset
 
 
 @router.get("/assets", response_model=list[Asset])
-def list_assets(session: Session = Depends(get_session)):
-    return session.exec(select(Asset)).all()
+def list_assets(session: Session = Depends(get_ro_session)):
+    return session.exec(Asset.__table__.select()).mappings().all()
 
 
 @router.post("/loans", response_model=Loan)
 def create_loan(loan: Loan, session: Session = Depends(get_session)):
     session.add(loan)
     session.commit()
+    bump_version()
     session.refresh(loan)
     return loan
 
 
 @router.get("/loans", response_model=list[Loan])
-def list_loans(session: Session = Depends(get_session)):
-    return session.exec(select(Loan)).all()
+def list_loans(session: Session = Depends(get_ro_session)):
+    return session.exec(Loan.__table__.select()).mappings().all()
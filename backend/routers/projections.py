@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, Query
+from functools import lru_cache
+from typing import List
+
+from fastapi import APIRouter, Query
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
-from backend.db import get_session
-from backend.schemas.projection import ProjectionResponse
+from backend import db
+from backend.schemas.projection import MonthlyBreakdown, ProjectionResponse
 from backend.services.calculations import compute_projection
 
 router = APIRouter(prefix="/api", tags=["projection"])
 
 
+@lru_cache(maxsize=64)
+def _compute_cached(start_year: int, years: int, initial_cash: float, version: int) -> List[MonthlyBreakdown]:
+    # version is only part of the key: a write bumps it and retires older entries.
+    with Session(db.ro_engine) as session:
+        return compute_projection(session, start_year=start_year, years=years, initial_cash=initial_cash)
+
+
 @router.get("/projections", response_model=ProjectionResponse)
-def get_projection(
+async def get_projection(
     start_year: int = Query(..., description="Fiscal year starting year (e.g. 2024 for 2024-2025)"),
     years: int = Query(3, ge=1, le=10, description="Number of fiscal years to project"),
     initial_cash: float = Query(0.0, description="Opening cash balance"),
-    session: Session = Depends(get_session),
 ):
-    periods = compute_projection(session, start_year=start_year, years=years, initial_cash=initial_cash)
+    # DB reads and the NumPy work stay synchronous; keep them off the event loop.
+    periods = await run_in_threadpool(_compute_cached, start_year, years, initial_cash, db.DATA_VERSION)
     return ProjectionResponse(periods=periods, metadata={"start_year": str(start_year), "years": str(years)})
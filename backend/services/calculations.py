@@ -1,11 +1,13 @@
 from datetime import date
 from math import pow
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, List, NamedTuple, Tuple
 
-from dateutil.relativedelta import relativedelta
+import numpy as np
+from sqlalchemy import RowMapping
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
-from backend.models import Asset, Contract, FixedCost, Loan, Offer, OfferType, PaymentEvent, Recurrence
+from backend.models import Asset, Contract, FixedCost, Loan, Offer, OfferType, Recurrence
 from backend.schemas.projection import MonthlyBreakdown
 
 
@@ -16,9 +18,17 @@ def month_start(d: date) -> date:
     return date(d.year, d.month, 1)
 
 
+def month_index(d: date, start: date) -> int:
+    return (d.year - start.year) * 12 + (d.month - start.month)
+
+
+def add_months(year: int, month: int, k: int) -> date:
+    t = (month - 1) + k
+    return date(year + t // 12, t % 12 + 1, 1)
+
+
 def generate_months(start_year: int, years: int, fiscal_start_month: int = FISCAL_START_MONTH) -> List[date]:
-    start = date(start_year, fiscal_start_month, 1)
-    return [start + relativedelta(months=i) for i in range(years * 12)]
+    return [add_months(start_year, fiscal_start_month, i) for i in range(years * 12)]
 
 
 def _ensure_offer_map(session: Session) -> Dict[int, Offer]:
@@ -26,128 +36,234 @@ def _ensure_offer_map(session: Session) -> Dict[int, Offer]:
     return {offer.id: offer for offer in offers}
 
 
+def _ensure_rate_map(offers: Dict[int, Offer]) -> Dict[int, float]:
+    # Licenses default to an 88% variable cost when no rate is set.
+    return {
+        offer_id: (offer.variable_cost_rate or 0.88)
+        if offer.offer_type == OfferType.LICENSE
+        else (offer.variable_cost_rate or 0.0)
+        for offer_id, offer in offers.items()
+    }
+
+
+def _contract_bounds(contract: Contract, months: List[date]) -> Tuple[int, int]:
+    # Index range of projection months covered by the contract, end month included.
+    lo = max(0, month_index(contract.start_date, months[0]))
+    hi = min(len(months), month_index(contract.end_date, months[0]) + 1) if contract.end_date else len(months)
+    return lo, max(lo, hi)
+
+
+def _plan_one_time(
+    contract: Contract,
+    months: List[date],
+    revenue: np.ndarray,
+    variable_costs: np.ndarray,
+    cash_inflows: np.ndarray,
+    rate: float,
+) -> None:
+    i = month_index(contract.start_date, months[0])
+    if 0 <= i < len(months):
+        amount = contract.total_value * contract.quantity
+        revenue[i] += amount
+        variable_costs[i] += amount * rate
+        cash_inflows[i] += amount * (1 + contract.tax_rate)
+
+
+def _plan_monthly(
+    contract: Contract,
+    months: List[date],
+    revenue: np.ndarray,
+    variable_costs: np.ndarray,
+    cash_inflows: np.ndarray,
+    rate: float,
+) -> None:
+    lo, hi = _contract_bounds(contract, months)
+    amount = contract.total_value * contract.quantity
+    revenue[lo:hi] += amount
+    variable_costs[lo:hi] += amount * rate
+    cash_inflows[lo:hi] += amount * (1 + contract.tax_rate)
+
+
+def _plan_annual(
+    contract: Contract,
+    months: List[date],
+    revenue: np.ndarray,
+    variable_costs: np.ndarray,
+    cash_inflows: np.ndarray,
+    rate: float,
+) -> None:
+    lo, hi = _contract_bounds(contract, months)
+    # First month at or after lo that falls on the contract's anniversary month.
+    first = lo + (month_index(contract.start_date, months[0]) - lo) % 12
+    amount = contract.total_value * contract.quantity
+    revenue[first:hi:12] += amount
+    variable_costs[first:hi:12] += amount * rate
+    cash_inflows[first:hi:12] += amount * (1 + contract.tax_rate)
+
+
+PLAN_FN = {
+    Recurrence.ONE_TIME: _plan_one_time,
+    Recurrence.MONTHLY: _plan_monthly,
+    Recurrence.ANNUAL: _plan_annual,
+}
+
+
 def _collect_payment_plan(
-    session: Session, contract: Contract, months: Iterable[date], offer: Offer
-) -> List[Tuple[date, float]]:
-    # If explicit payment events exist, use them.
-    if contract.id:
-        explicit_events = session_payment_events(session, contract, months)
-        if explicit_events:
-            return explicit_events
-
-    # Build synthetic payment plan based on recurrence.
-    plan: List[Tuple[date, float]] = []
-    if contract.recurrence == Recurrence.ONE_TIME:
-        plan.append((month_start(contract.start_date), contract.total_value * contract.quantity))
-    elif contract.recurrence == Recurrence.MONTHLY:
-        for m in months:
-            if m >= month_start(contract.start_date) and (not contract.end_date or m <= month_start(contract.end_date)):
-                plan.append((m, contract.total_value * contract.quantity))
-    elif contract.recurrence == Recurrence.ANNUAL:
-        for m in months:
-            if m.month == contract.start_date.month and m >= month_start(contract.start_date):
-                if not contract.end_date or m <= month_start(contract.end_date):
-                    plan.append((m, contract.total_value * contract.quantity))
-    return plan
-
-def session_payment_events(
-    session: Session, contract: Contract, months: Iterable[date]
-) -> List[Tuple[date, float]]:
-    events: List[Tuple[date, float]] = []
-    if not contract.id:
-        return events
-    for evt in session.exec(select(PaymentEvent).where(PaymentEvent.contract_id == contract.id)).all():
-        due_month = month_start(evt.due_date)
-        if due_month in months:
-            events.append((due_month, evt.amount))
-    return events
-
-
-def compute_projection(session: Session, start_year: int, years: int, initial_cash: float = 0.0) -> List[MonthlyBreakdown]:
+    contract: Contract,
+    months: List[date],
+    idx_of: Dict[date, int],
+    revenue: np.ndarray,
+    variable_costs: np.ndarray,
+    cash_inflows: np.ndarray,
+    rate: float,
+) -> None:
+    # If explicit payment events fall in the projection, use them.
+    matched = False
+    for evt in contract.payment_events:
+        i = idx_of.get(month_start(evt.due_date))
+        if i is None:
+            continue
+        matched = True
+        revenue[i] += evt.amount
+        variable_costs[i] += evt.amount * rate
+        cash_inflows[i] += evt.amount * (1 + contract.tax_rate)
+    if matched:
+        return
+
+    # Build synthetic payment plan based on recurrence; contracts without one contribute nothing.
+    planner = PLAN_FN.get(contract.recurrence)
+    if planner is None:
+        return
+    planner(contract, months, revenue, variable_costs, cash_inflows, rate)
+
+
+class ProjectionInputs(NamedTuple):
+    offers: Dict[int, Offer]
+    contracts: List[Contract]
+    fixed_costs: List[RowMapping]
+    assets: List[RowMapping]
+    loans: List[RowMapping]
+
+
+def _load_inputs(session: Session) -> ProjectionInputs:
+    # All reads run before any month arithmetic. On the reader engine the session's
+    # transaction starts with an explicit BEGIN, so they share one snapshot.
+    return ProjectionInputs(
+        offers=_ensure_offer_map(session),
+        # selectinload attaches every contract's events with one extra IN query.
+        contracts=session.exec(select(Contract).options(selectinload(Contract.payment_events))).all(),
+        fixed_costs=session.exec(FixedCost.__table__.select()).mappings().all(),
+        assets=session.exec(Asset.__table__.select()).mappings().all(),
+        loans=session.exec(Loan.__table__.select()).mappings().all(),
+    )
+
+
+def _amortize(
+    principal: float, monthly_rate: float, term: int, start_idx: int, n: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Annuity schedule laid over the n projection months, first instalment at start_idx.
+    interest = np.zeros(n)
+    repaid = np.zeros(n)
+    payments = np.zeros(n)
+    lo, hi = max(0, start_idx), min(n, start_idx + term)
+    if lo >= hi:
+        return interest, repaid, payments
+    payment = principal * (monthly_rate / (1 - pow(1 + monthly_rate, -term)))
+    # Closed-form balance before each instalment: B_k = P(1+r)^k - A((1+r)^k - 1) / r
+    growth = np.power(1 + monthly_rate, np.arange(hi - lo))
+    balance = principal * growth - payment * (growth - 1) / monthly_rate
+    interest[lo:hi] = balance * monthly_rate
+    repaid[lo:hi] = payment - interest[lo:hi]
+    payments[lo:hi] = payment
+    return interest, repaid, payments
+
+
+def compute_projection(
+    session: Session,
+    start_year: int,
+    years: int,
+    initial_cash: float = 0.0,
+) -> List[MonthlyBreakdown]:
     months = generate_months(start_year, years)
-    offer_map = _ensure_offer_map(session)
+    start = months[0]
+    n = len(months)
+    idx_of: Dict[date, int] = {m: i for i, m in enumerate(months)}
+    inputs = _load_inputs(session)
 
-    revenue: Dict[date, float] = {m: 0.0 for m in months}
-    variable_costs: Dict[date, float] = {m: 0.0 for m in months}
-    cash_inflows: Dict[date, float] = {m: 0.0 for m in months}
-    cash_outflows: Dict[date, float] = {m: 0.0 for m in months}
-    fixed_costs: Dict[date, float] = {m: 0.0 for m in months}
+    revenue = np.zeros(n)
+    variable_costs = np.zeros(n)
+    cash_inflows = np.zeros(n)
+    cash_outflows = np.zeros(n)
+    fixed_costs = np.zeros(n)
 
     # Contracts and payments
-    for contract in session.exec(select(Contract)).all():
-        offer = offer_map.get(contract.offer_id)
-        if not offer:
+    rate_by_offer_id = _ensure_rate_map(inputs.offers)
+    for contract in inputs.contracts:
+        rate = rate_by_offer_id.get(contract.offer_id)
+        if rate is None:
             continue
-        plan = _collect_payment_plan(session, contract, months, offer)
-        for due_month, amount in plan:
-            if due_month in revenue:
-                revenue[due_month] += amount
-                if offer.offer_type == OfferType.LICENSE:
-                    variable_costs[due_month] += amount * (offer.variable_cost_rate or 0.88)
-                elif offer.variable_cost_rate:
-                    variable_costs[due_month] += amount * offer.variable_cost_rate
-            if due_month in cash_inflows:
-                cash_inflows[due_month] += amount * (1 + contract.tax_rate)
+        _collect_payment_plan(
+            contract,
+            months,
+            idx_of,
+            revenue,
+            variable_costs,
+            cash_inflows,
+            rate,
+        )
 
     # Fixed costs
-    for fixed in session.exec(select(FixedCost)).all():
-        for m in months:
-            if m >= month_start(fixed.start_date) and (not fixed.end_date or m <= month_start(fixed.end_date)):
-                fixed_costs[m] += fixed.monthly_amount
-                cash_outflows[m] += fixed.monthly_amount
+    for fixed in inputs.fixed_costs:
+        lo = max(0, month_index(fixed["start_date"], start))
+        hi = min(n, month_index(fixed["end_date"], start) + 1) if fixed["end_date"] else n
+        if lo < hi:
+            fixed_costs[lo:hi] += fixed["monthly_amount"]
+            cash_outflows[lo:hi] += fixed["monthly_amount"]
 
     # Assets amortization
-    amortization: Dict[date, float] = {m: 0.0 for m in months}
-    for asset in session.exec(select(Asset)).all():
-        monthly = asset.purchase_amount / asset.amortization_months
-        for i in range(asset.amortization_months):
-            m = month_start(asset.purchase_date) + relativedelta(months=i)
-            if m in amortization:
-                amortization[m] += monthly
-                cash_outflows[m] += 0 if i else asset.purchase_amount  # purchase at start
+    amortization = np.zeros(n)
+    for asset in inputs.assets:
+        monthly = asset["purchase_amount"] / asset["amortization_months"]
+        first = month_index(asset["purchase_date"], start)
+        lo, hi = max(0, first), min(n, first + asset["amortization_months"])
+        if lo < hi:
+            amortization[lo:hi] += monthly
+        if 0 <= first < n:
+            cash_outflows[first] += asset["purchase_amount"]  # purchase at start
 
     # Loans schedule (annuity)
-    loan_interest: Dict[date, float] = {m: 0.0 for m in months}
-    loan_principal: Dict[date, float] = {m: 0.0 for m in months}
-    for loan in session.exec(select(Loan)).all():
-        monthly_rate = loan.annual_rate / 12
-        payment = loan.principal * (monthly_rate / (1 - pow(1 + monthly_rate, -loan.term_months)))
-        balance = loan.principal
-        for i in range(loan.term_months):
-            m = month_start(loan.start_date) + relativedelta(months=i)
-            if m not in loan_interest:
-                continue
-            interest = balance * monthly_rate
-            principal = payment - interest
-            balance -= principal
-            loan_interest[m] += interest
-            loan_principal[m] += principal
-            cash_outflows[m] += payment
+    loan_interest = np.zeros(n)
+    loan_principal = np.zeros(n)
+    for loan in inputs.loans:
+        monthly_rate = loan["annual_rate"] / 12
+        interest, principal, payment = _amortize(
+            loan["principal"], monthly_rate, loan["term_months"], month_index(loan["start_date"], start), n
+        )
+        loan_interest += interest
+        loan_principal += principal
+        cash_outflows += payment
 
     # Build monthly breakdown
+    ebt = revenue - variable_costs - fixed_costs - amortization - loan_interest
+    cumulative_cash = np.cumsum(np.concatenate(([initial_cash], cash_inflows - cash_outflows)))[1:]
+    series = (revenue, variable_costs, fixed_costs, amortization, loan_interest, loan_principal, ebt, cumulative_cash)
+    for arr in series:
+        np.round(arr, 2, out=arr)
+    columns = zip(months, *(arr.tolist() for arr in series))
+    # Values are already floats rounded to cents; skip re-validating each row.
     breakdown: List[MonthlyBreakdown] = []
-    cumulative_cash = initial_cash
-    for m in months:
-        pnl_revenue = revenue[m]
-        pnl_variable = variable_costs[m]
-        pnl_fixed = fixed_costs[m]
-        pnl_amort = amortization[m]
-        pnl_interest = loan_interest[m]
-        pnl_principal = loan_principal[m]
-        ebt = pnl_revenue - pnl_variable - pnl_fixed - pnl_amort - pnl_interest
-        net_cash_flow = cash_inflows[m] - cash_outflows[m]
-        cumulative_cash += net_cash_flow
+    for m, pnl_revenue, pnl_variable, pnl_fixed, pnl_amort, pnl_interest, pnl_principal, pnl_ebt, cash in columns:
         breakdown.append(
-            MonthlyBreakdown(
+            MonthlyBreakdown.model_construct(
                 month=m,
-                revenue=round(pnl_revenue, 2),
-                variable_costs=round(pnl_variable, 2),
-                fixed_costs=round(pnl_fixed, 2),
-                amortization=round(pnl_amort, 2),
-                loan_interest=round(pnl_interest, 2),
-                loan_principal=round(pnl_principal, 2),
-                ebt=round(ebt, 2),
-                cash=round(cumulative_cash, 2),
+                revenue=pnl_revenue,
+                variable_costs=pnl_variable,
+                fixed_costs=pnl_fixed,
+                amortization=pnl_amort,
+                loan_interest=pnl_interest,
+                loan_principal=pnl_principal,
+                ebt=pnl_ebt,
+                cash=cash,
             )
         )
     return breakdown